@@ -3,10 +3,13 @@ List operations module with optimized duplicate removal function.
 Fixed performance issues and added proper error handling.
 """
 
-from typing import List, TypeVar, Optional, Union
+from typing import Iterator, List, TypeVar, Optional, Union
 
 T = TypeVar('T')
 
+# Placeholder for "no previous item"; compares unequal to everything
+_SENTINEL = object()
+
 
 def remove_duplicates(my_list: List[T]) -> List[T]:
     """
@@ -35,24 +38,16 @@ def remove_duplicates(my_list: List[T]) -> List[T]:
     if not my_list:
         return []
     
-    # Optimized O(n) algorithm using set for O(1) lookups
-    seen = set()
-    unique_items = []
-    
-    for item in my_list:
-        # Handle unhashable types (like lists, dicts) by converting to tuple
-        if isinstance(item, (list, dict)):
-            # Convert to tuple for hashing, but this changes the item type
-            # Better to use a different approach for complex objects
-            item_key = tuple(item) if isinstance(item, list) else tuple(sorted(item.items()))
-        else:
-            item_key = item
-            
-        if item_key not in seen:
-            seen.add(item_key)
-            unique_items.append(item)
+    # Fast path: hashable items are deduplicated entirely inside dict's C loop.
+    # Skip it when the first item is already a list/dict, since it would fail.
+    if type(my_list[0]) not in (list, dict):
+        try:
+            return list(dict.fromkeys(my_list))
+        except TypeError:
+            pass
     
-    return unique_items
+    # Generic O(n) path for unhashable items (lists, dicts)
+    return list(_iter_unique(my_list))
 
 
 def remove_duplicates_simple(my_list: List[T]) -> List[T]:
@@ -68,15 +63,74 @@ def remove_duplicates_simple(my_list: List[T]) -> List[T]:
     if not my_list:
         return []
     
+    # dict preserves insertion order, so this keeps the first occurrence
+    return list(dict.fromkeys(my_list))
+
+
+def _iter_unique(my_list: List[T]) -> Iterator[T]:
+    """
+    Yield the first occurrence of each item, handling unhashable items.
+    
+    Shared generator behind remove_duplicates and iter_unique; callers are
+    responsible for input validation.
+    """
+    # O(n) algorithm using set for O(1) lookups
     seen = set()
-    unique_items = []
+    # list/dict objects already keyed, by id. Holding a reference keeps each
+    # one alive, so its id cannot be reused by a new object while a lazy
+    # consumer modifies the list between items.
+    seen_objects = {}
+    # Bind the bound method once to skip attribute lookups in the loop
+    seen_add = seen.add
+    # Previous item, to catch runs of equal lists/dicts with one comparison
+    last = _SENTINEL
     
     for item in my_list:
-        if item not in seen:
-            seen.add(item)
-            unique_items.append(item)
+        previous, last = last, item
+        # Handle unhashable types: lists become tuples, dicts become
+        # frozensets (order-insensitive, no sort needed)
+        if isinstance(item, (list, dict)):
+            # Repeated references and back-to-back duplicates skip the key
+            # construction entirely
+            if id(item) in seen_objects or item == previous:
+                continue
+            seen_objects[id(item)] = item
+            if isinstance(item, list):
+                item_key = tuple(item)
+            else:
+                item_key = frozenset(item.items())
+        else:
+            item_key = item
+            
+        if item_key not in seen:
+            seen_add(item_key)
+            yield item
+
+
+def iter_unique(my_list: List[T]) -> Iterator[T]:
+    """
+    Lazily yield items of a list with duplicates removed, preserving order.
+    
+    Streaming counterpart of remove_duplicates: the output list is never
+    materialized, so consumers that only iterate keep peak memory down.
+    Input is validated eagerly, before the first item is requested.
+    
+    Args:
+        my_list: Input list that may contain duplicates
+        
+    Returns:
+        Iterator over the first occurrence of each item
+        
+    Raises:
+        TypeError: If input is not a list
+        ValueError: If input list is None
+    """
+    if my_list is None:
+        raise ValueError("Input list cannot be None")
+    if not isinstance(my_list, list):
+        raise TypeError(f"Expected list, got {type(my_list).__name__}")
     
-    return unique_items
+    return _iter_unique(my_list)
 
 
 # Example usage (only runs when script is executed directly)
@@ -4,7 +4,7 @@ Tests both normal cases and edge cases for the remove_duplicates function.
 """
 
 import pytest
-from list_ops import remove_duplicates, remove_duplicates_simple
+from list_ops import iter_unique, remove_duplicates, remove_duplicates_simple
 
 
 class TestRemoveDuplicates:
@@ -91,6 +91,37 @@ class TestRemoveDuplicates:
         result = remove_duplicates(input_list)
         assert result == expected
     
+    def test_dictionaries_key_order(self):
+        """Test that dicts with the same items in different order are duplicates."""
+        input_list = [{"a": 1, "b": 2}, {"b": 2, "a": 1}, {1: "x", "y": 2}]
+        expected = [{"a": 1, "b": 2}, {1: "x", "y": 2}]
+        result = remove_duplicates(input_list)
+        assert result == expected
+    
+    def test_consecutive_unhashable_duplicates(self):
+        """Test runs of equal but distinct lists/dicts."""
+        input_list = [[1], [1], [1], {"a": 1}, {"a": 1}, [1], [2]]
+        expected = [[1], {"a": 1}, [2]]
+        result = remove_duplicates(input_list)
+        assert result == expected
+    
+    def test_repeated_references(self):
+        """Test that the same list/dict object repeated is removed."""
+        shared_dict = {"a": 1}
+        shared_list = [1, 2]
+        input_list = [shared_dict, shared_list, shared_dict, {"a": 1}, shared_list]
+        result = remove_duplicates(input_list)
+        assert result == [{"a": 1}, [1, 2]]
+        assert result[0] is shared_dict
+        assert result[1] is shared_list
+    
+    def test_hashable_then_unhashable(self):
+        """Test fallback when unhashable items follow hashable ones."""
+        input_list = [1, 2, 1, [3, 4], [3, 4], 2]
+        expected = [1, 2, [3, 4]]
+        result = remove_duplicates(input_list)
+        assert result == expected
+    
     def test_none_input(self):
         """Test error handling for None input."""
         with pytest.raises(ValueError, match="Input list cannot be None"):
@@ -130,6 +161,14 @@ class TestRemoveDuplicatesSimple:
         result = remove_duplicates_simple(input_list)
         assert result == expected
     
+    def test_large_numeric_list(self):
+        """Test large int/float list keeps first occurrences and their types."""
+        input_list = list(range(5000)) * 3 + [1.0, 2.5, 2.5]
+        expected = list(range(5000)) + [2.5]
+        result = remove_duplicates_simple(input_list)
+        assert result == expected
+        assert type(result[1]) is int
+    
     def test_error_handling(self):
         """Test error handling in simple version."""
         with pytest.raises(ValueError):
@@ -139,6 +178,35 @@ class TestRemoveDuplicatesSimple:
             remove_duplicates_simple("not a list")
 
 
+class TestIterUnique:
+    """Test cases for iter_unique generator."""
+    
+    def test_yields_unique_items_lazily(self):
+        """Test that items are streamed in order without building a list."""
+        result = iter_unique([3, [1], 3, {"a": 1}, [1], {"a": 1}])
+        assert not isinstance(result, list)
+        assert next(result) == 3
+        assert list(result) == [[1], {"a": 1}]
+    
+    def test_list_modified_between_items(self):
+        """Test that freed items cannot hide new ones reusing their id."""
+        input_list = [[1], [5], [6], 0, 0]
+        result = iter_unique(input_list)
+        assert [next(result) for _ in range(3)] == [[1], [5], [6]]
+        
+        input_list[0] = None
+        input_list[4] = [9]
+        assert list(result) == [0, [9]]
+    
+    def test_error_handling_is_eager(self):
+        """Test that invalid input raises before iteration starts."""
+        with pytest.raises(ValueError):
+            iter_unique(None)
+        
+        with pytest.raises(TypeError):
+            iter_unique("not a list")
+
+
 class TestEdgeCases:
     """Test various edge cases and corner conditions."""
     
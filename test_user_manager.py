@@ -8,34 +8,54 @@ Author: Test suite for PEP 8 compliant UserManager
 Version: 1.0.0
 """
 
+import csv
+import glob
 import json
 import os
+import stat
 import tempfile
 import unittest
-from unittest.mock import patch, mock_open
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch, mock_open
 
+import user_manager
 from user_manager import UserManager
 
 
+@contextmanager
+def mock_data_file(read_data):
+    """Serve a data file from memory, including its size for os.fstat."""
+    with patch("builtins.open", mock_open(read_data=read_data)) as mocked, \
+            patch("user_manager.os.fstat",
+                  return_value=MagicMock(st_size=len(read_data))):
+        yield mocked
+
+
 class TestUserManager(unittest.TestCase):
     """Test cases for UserManager class."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Create one temporary file shared by every test in the class."""
+        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
+        temp_file.close()
+        cls.temp_file_path = temp_file.name
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the shared temporary file."""
+        if os.path.exists(cls.temp_file_path):
+            os.unlink(cls.temp_file_path)
+    
     def setUp(self):
         """Set up test fixtures before each test method."""
-        # Create a temporary file for testing
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
-        self.temp_file.close()
-        self.temp_file_path = self.temp_file.name
+        # Reset the shared temporary file instead of creating a new one
+        with open(self.temp_file_path, 'w') as f:
+            f.write('[]')
         
         # Initialize UserManager with temporary file
         self.user_manager = UserManager(self.temp_file_path)
     
-    def tearDown(self):
-        """Clean up after each test method."""
-        # Remove temporary file
-        if os.path.exists(self.temp_file_path):
-            os.unlink(self.temp_file_path)
-    
     def test_init_with_default_file(self):
         """Test initialization with default file."""
         manager = UserManager()
@@ -50,11 +70,9 @@ class TestUserManager(unittest.TestCase):
     
     def test_load_users_empty_file(self):
         """Test loading users from empty file."""
-        # Create empty file
-        with open(self.temp_file_path, 'w') as f:
-            f.write('[]')
-        
-        manager = UserManager(self.temp_file_path)
+        # Serve an empty JSON list from memory instead of disk
+        with mock_data_file('[]'):
+            manager = UserManager("anything.json")
         self.assertEqual(manager.users_list, [])
     
     def test_load_users_with_data(self):
@@ -64,12 +82,51 @@ class TestUserManager(unittest.TestCase):
              "age": 25, "created_date": "2023-01-01", "is_active": True}
         ]
         
+        with mock_data_file(json.dumps(test_data)):
+            manager = UserManager("anything.json")
+        self.assertEqual(len(manager.users_list), 1)
+        self.assertEqual(manager.users_list[0]["name"], "Test User")
+    
+    @unittest.skipIf(user_manager.orjson is None, "orjson is not installed")
+    def test_load_users_memory_mapped(self):
+        """Test loading a data file through the memory-mapped path."""
+        test_data = [
+            {"id": 1, "name": "Nguyễn Văn An", "email": "an@example.com",
+             "age": 25, "created_date": "2023-01-01", "is_active": True}
+        ]
+        with open(self.temp_file_path, 'w', encoding='utf-8') as f:
+            json.dump(test_data, f, ensure_ascii=False)
+        
+        with patch("user_manager._MMAP_MIN_SIZE", 0), \
+                patch("user_manager.mmap.mmap", wraps=user_manager.mmap.mmap) as mock_mmap:
+            manager = UserManager(self.temp_file_path)
+        
+        mock_mmap.assert_called_once()
+        self.assertEqual(manager.users_list, test_data)
+    
+    def test_load_users_incomplete_records(self):
+        """Test loading records that miss some fields."""
         with open(self.temp_file_path, 'w') as f:
-            json.dump(test_data, f)
+            json.dump([{"test": "data"}, {"id": 2, "name": "No Status",
+                                          "email": "x@example.com", "age": 30}], f)
         
         manager = UserManager(self.temp_file_path)
-        self.assertEqual(len(manager.users_list), 1)
-        self.assertEqual(manager.users_list[0]["name"], "Test User")
+        self.assertEqual(len(manager.users_list), 2)
+        self.assertEqual(manager.get_user_by_id(2)["name"], "No Status")
+        self.assertEqual(manager.search_users_by_name("status")[0]["id"], 2)
+    
+    def test_load_users_not_a_list(self):
+        """Test loading a JSON file that does not hold a list of users."""
+        for content in ('null', '42', '[1, 2]', '{}', '""'):
+            with open(self.temp_file_path, 'w') as f:
+                f.write(content)
+            
+            with patch("builtins.print") as mock_print:
+                manager = UserManager(self.temp_file_path)
+            self.assertEqual(manager.users_list, [])
+            self.assertIn("Error loading users",
+                          mock_print.call_args.args[0])
+            self.assertTrue(manager.add_user("User", "user@example.com", 25))
     
     def test_load_users_file_not_found(self):
         """Test loading users when file doesn't exist."""
@@ -79,10 +136,8 @@ class TestUserManager(unittest.TestCase):
     
     def test_load_users_invalid_json(self):
         """Test loading users with invalid JSON."""
-        with open(self.temp_file_path, 'w') as f:
-            f.write('invalid json content')
-        
-        manager = UserManager(self.temp_file_path)
+        with mock_data_file('invalid json content'):
+            manager = UserManager("anything.json")
         self.assertEqual(manager.users_list, [])
     
     def test_save_users(self):
@@ -97,11 +152,21 @@ class TestUserManager(unittest.TestCase):
         }
         
         self.user_manager.users_list = [test_user]
-        self.user_manager.save_users()
+        with patch("builtins.open", mock_open()) as mocked_file, \
+                patch("user_manager.os.open", return_value=-1) as mock_os_open, \
+                patch("user_manager.os.fsync"), \
+                patch("user_manager.os.chmod"), \
+                patch("user_manager.os.replace") as mock_replace:
+            self.user_manager.save_users()
         
-        # Verify file was created and contains correct data
-        with open(self.temp_file_path, 'r') as f:
-            saved_data = json.load(f)
+        # The temporary file is moved over the data file
+        temp_path = mock_os_open.call_args.args[0]
+        self.assertTrue(temp_path.startswith(self.temp_file_path + "."))
+        mock_replace.assert_called_once_with(temp_path, self.temp_file_path)
+        
+        # Rebuild the written JSON from the in-memory file writes
+        written = b"".join(call.args[0] for call in mocked_file().write.call_args_list)
+        saved_data = json.loads(written)
         
         self.assertEqual(len(saved_data), 1)
         self.assertEqual(saved_data[0]["name"], "Test User")
@@ -146,6 +211,120 @@ class TestUserManager(unittest.TestCase):
         self.assertFalse(result)
         self.assertEqual(len(self.user_manager.users_list), 1)
     
+    def test_add_users_bulk(self):
+        """Test adding several users in one batch."""
+        self.user_manager.add_user("John Doe", "john@example.com", 30)
+        
+        rows = [
+            ("Jane Doe", "jane@example.com", 25),
+            ("Duplicate", "john@example.com", 40),    # existing email
+            ("Jane Again", "jane@example.com", 26),   # duplicate within batch
+            ("", "empty@example.com", 20),            # empty name
+            ("Negative", "negative@example.com", -1), # invalid age
+            {"name": "Bob Smith", "email": "bob@example.com", "age": 35},
+            {"name": "No Age", "email": "noage@example.com"},  # missing age
+        ]
+        with patch.object(self.user_manager, 'save_users') as mock_save:
+            results = self.user_manager.add_users_bulk(rows)
+        
+        self.assertEqual(results, [True, False, False, False, False, True, False])
+        mock_save.assert_called_once()
+        self.assertEqual(
+            [user["email"] for user in self.user_manager.users_list],
+            ["john@example.com", "jane@example.com", "bob@example.com"]
+        )
+        self.assertEqual([user["id"] for user in self.user_manager.users_list], [1, 2, 3])
+    
+    def test_add_users_bulk_malformed_rows(self):
+        """Test that rows that cannot be unpacked are rejected, not raised."""
+        rows = [
+            ("Jane Doe", "jane@example.com", 25),
+            ("Too Short", "short@example.com"),
+            ("Too", "long@example.com", 30, "extra"),
+            None,
+            ("Bob Smith", "bob@example.com", 35),
+        ]
+        results = self.user_manager.add_users_bulk(rows)
+        
+        self.assertEqual(results, [True, False, False, False, True])
+        with open(self.temp_file_path, 'r') as f:
+            self.assertEqual(len(json.load(f)), 2)
+    
+    def test_add_users_bulk_aborted_batch_is_saved(self):
+        """Test that rows added before an error are still persisted."""
+        def rows():
+            yield ("Jane Doe", "jane@example.com", 25)
+            raise RuntimeError("source failed")
+        
+        with self.assertRaises(RuntimeError):
+            self.user_manager.add_users_bulk(rows())
+        
+        with open(self.temp_file_path, 'r') as f:
+            self.assertEqual(len(json.load(f)), 1)
+    
+    def test_add_users_bulk_nothing_added(self):
+        """Test that a batch with no valid rows does not save."""
+        with patch.object(self.user_manager, 'save_users') as mock_save:
+            results = self.user_manager.add_users_bulk([("", "", 0)])
+        
+        self.assertEqual(results, [False])
+        mock_save.assert_not_called()
+    
+    def test_autosave_disabled_defers_writes(self):
+        """Test that mutations are only written on flush when autosave is off."""
+        manager = UserManager(self.temp_file_path, autosave=False)
+        manager.add_user("User 1", "user1@example.com", 25)
+        manager.add_user("User 2", "user2@example.com", 30)
+        manager.update_user_status(1, False)
+        
+        with open(self.temp_file_path, 'r') as f:
+            self.assertEqual(json.load(f), [])
+        
+        manager.flush()
+        with open(self.temp_file_path, 'r') as f:
+            saved_data = json.load(f)
+        self.assertEqual(len(saved_data), 2)
+        self.assertFalse(saved_data[0]["is_active"])
+    
+    def test_flush_without_changes(self):
+        """Test that flush does not write when nothing changed."""
+        with patch.object(self.user_manager, 'save_users') as mock_save:
+            self.user_manager.flush()
+        mock_save.assert_not_called()
+    
+    def test_context_manager_flushes_on_exit(self):
+        """Test that leaving a with-block saves pending changes."""
+        with UserManager(self.temp_file_path, autosave=False) as manager:
+            manager.add_user("User 1", "user1@example.com", 25)
+        
+        with open(self.temp_file_path, 'r') as f:
+            saved_data = json.load(f)
+        self.assertEqual(len(saved_data), 1)
+    
+    def test_save_every_n_mutations(self):
+        """Test that pending changes are flushed after N mutations."""
+        manager = UserManager(self.temp_file_path, autosave=False,
+                              save_every_n_mutations=2)
+        with patch.object(manager, 'save_users', wraps=manager.save_users) as mock_save:
+            manager.add_user("User 1", "user1@example.com", 25)
+            mock_save.assert_not_called()
+            manager.add_user("User 2", "user2@example.com", 30)
+            mock_save.assert_called_once()
+            manager.add_user("User 3", "user3@example.com", 35)
+            mock_save.assert_called_once()
+    
+    def test_save_every_n_mutations_counts_bulk_rows(self):
+        """Test that every row added in bulk counts as a mutation."""
+        manager = UserManager(self.temp_file_path, autosave=False,
+                              save_every_n_mutations=3)
+        with patch.object(manager, 'save_users', wraps=manager.save_users) as mock_save:
+            manager.add_users_bulk([("User 1", "user1@example.com", 25),
+                                    ("User 2", "user2@example.com", 30),
+                                    ("User 3", "user1@example.com", 35)])
+            mock_save.assert_not_called()
+            manager.add_users_bulk([("User 4", "user4@example.com", 40)])
+            mock_save.assert_called_once()
+    
     def test_get_user_by_id_success(self):
         """Test getting user by ID successfully."""
         self.user_manager.add_user("John Doe", "john@example.com", 30)
@@ -154,6 +333,27 @@ class TestUserManager(unittest.TestCase):
         self.assertIsNotNone(user)
         self.assertEqual(user["name"], "John Doe")
     
+    def test_assign_users_list_rebuilds_indexes(self):
+        """Test that assigning users_list keeps lookups working."""
+        self.user_manager.users_list = [
+            {"id": 7, "name": "Test User", "email": "test@example.com",
+             "age": 25, "created_date": "2023-01-01", "is_active": True}
+        ]
+        
+        self.assertEqual(self.user_manager.get_user_by_id(7)["name"], "Test User")
+        self.assertFalse(self.user_manager.add_user("Other", "test@example.com", 30))
+        self.assertTrue(self.user_manager.add_user("Other", "other@example.com", 30))
+        self.assertEqual(self.user_manager.get_user_by_id(8)["name"], "Other")
+    
+    def test_reindex_after_email_edit(self):
+        """Test that reindex picks up an email edited in place."""
+        self.user_manager.add_user("John Doe", "old@example.com", 30)
+        self.user_manager.get_user_by_id(1)["email"] = "new@example.com"
+        self.user_manager.reindex()
+        
+        self.assertTrue(self.user_manager.add_user("Jane Doe", "old@example.com", 25))
+        self.assertFalse(self.user_manager.add_user("Jane Doe", "new@example.com", 25))
+    
     def test_get_user_by_id_not_found(self):
         """Test getting user by non-existent ID."""
         user = self.user_manager.get_user_by_id(999)
@@ -209,6 +409,52 @@ class TestUserManager(unittest.TestCase):
         result = self.user_manager.delete_user(999)
         self.assertFalse(result)
     
+    def test_delete_user_equal_records(self):
+        """Test that delete removes the indexed record, not an equal copy."""
+        record = {"id": 1, "name": "Twin", "email": "twin@example.com",
+                  "age": 25, "created_date": "2023-01-01", "is_active": True}
+        twin = dict(record)
+        self.user_manager.users_list = [record, twin]
+        
+        self.assertTrue(self.user_manager.delete_user(1))
+        self.assertEqual(len(self.user_manager.users_list), 1)
+        self.assertIs(self.user_manager.users_list[0], record)
+    
+    def test_delete_user_loaded_records(self):
+        """Test deleting loaded records without an email or sharing keys."""
+        base = {"age": 25, "created_date": "2023-01-01", "is_active": True}
+        with open(self.temp_file_path, 'w') as f:
+            json.dump([
+                dict(base, id=1, name="No Email"),
+                dict(base, id=2, name="Shared 1", email="shared@example.com"),
+                dict(base, id=3, name="Shared 2", email="shared@example.com"),
+                dict(base, id=4, name="Twin 1", email="twin1@example.com"),
+                dict(base, id=4, name="Twin 2", email="twin2@example.com"),
+            ], f)
+        manager = UserManager(self.temp_file_path)
+        
+        self.assertTrue(manager.delete_user(1))
+        self.assertTrue(manager.delete_user(3))
+        self.assertFalse(manager.add_user("Copy", "shared@example.com", 30))
+        
+        self.assertTrue(manager.delete_user(4))
+        self.assertTrue(manager.delete_user(4))
+        self.assertFalse(manager.delete_user(4))
+        self.assertEqual([user["name"] for user in manager.users_list],
+                         ["Shared 1"])
+    
+    def test_delete_user_then_add(self):
+        """Test that IDs stay unique and emails are freed after a delete."""
+        self.user_manager.add_user("User 1", "user1@example.com", 25)
+        self.user_manager.add_user("User 2", "user2@example.com", 30)
+        self.user_manager.delete_user(1)
+        
+        self.assertTrue(self.user_manager.add_user("User 1", "user1@example.com", 25))
+        ids = [user["id"] for user in self.user_manager.users_list]
+        self.assertEqual(ids, [2, 3])
+        self.assertEqual(self.user_manager.get_user_by_id(3)["name"], "User 1")
+        self.assertIsNone(self.user_manager.get_user_by_id(1))
+    
     def test_get_active_users_count(self):
         """Test getting count of active users."""
         # Add users with different statuses
@@ -240,6 +486,86 @@ class TestUserManager(unittest.TestCase):
         results = self.user_manager.search_users_by_name("NonExistent")
         self.assertEqual(len(results), 0)
     
+    def test_search_users_by_name_after_delete(self):
+        """Test that search results stay correct after deleting a user."""
+        self.user_manager.add_user("John Smith", "john@example.com", 30)
+        self.user_manager.add_user("Jane Smith", "jane@example.com", 25)
+        self.user_manager.add_user("Bob Johnson", "bob@example.com", 35)
+        self.user_manager.delete_user(1)
+        
+        results = self.user_manager.search_users_by_name("john")
+        self.assertEqual([user["name"] for user in results], ["Bob Johnson"])
+        
+        results = self.user_manager.search_users_by_name("SMITH")
+        self.assertEqual([user["name"] for user in results], ["Jane Smith"])
+    
+    def test_search_users_by_name_case_folding(self):
+        """Test that search matches using Unicode case folding."""
+        self.user_manager.add_user("Hans Straße", "hans@example.com", 40)
+        self.user_manager.add_user("Nguyễn Văn An", "an@example.com", 25)
+        
+        results = self.user_manager.search_users_by_name("STRASSE")
+        self.assertEqual(len(results), 1)
+        
+        results = self.user_manager.search_users_by_name("NGUYỄN")
+        self.assertEqual(len(results), 1)
+        
+        # The folded-name cache follows renames once reindexed
+        self.user_manager.get_user_by_id(1)["name"] = "Hans Weiß"
+        self.user_manager.reindex()
+        self.assertEqual(self.user_manager.search_users_by_name("STRASSE"), [])
+        self.assertEqual(len(self.user_manager.search_users_by_name("WEISS")), 1)
+    
+    def test_search_after_direct_list_changes(self):
+        """Test search and delete after users_list is changed in place."""
+        self.user_manager.add_user("A", "a@example.com", 25)
+        self.user_manager.users_list.append(
+            {"id": 2, "name": "B", "email": "b@example.com", "age": 30,
+             "created_date": "2023-01-01", "is_active": True}
+        )
+        
+        self.assertEqual(len(self.user_manager.search_users_by_name("B")), 1)
+        self.assertEqual(self.user_manager.get_user_by_id(2)["name"], "B")
+        
+        self.user_manager.users_list.insert(
+            0, {"id": 3, "name": "C", "email": "c@example.com", "age": 35,
+                "created_date": "2023-01-01", "is_active": True}
+        )
+        self.assertTrue(self.user_manager.delete_user(1))
+        self.assertEqual(
+            [user["name"] for user in self.user_manager.search_users_by_name("B")],
+            ["B"]
+        )
+        self.assertEqual(len(self.user_manager.search_users_by_name("C")), 1)
+    
+    def test_replace_list_item_and_reindex(self):
+        """Test lookups after replacing an item of users_list in place."""
+        self.user_manager.add_user("A", "a@example.com", 25)
+        self.user_manager.users_list[0] = {
+            "id": 5, "name": "Bob", "email": "b@example.com", "age": 30,
+            "created_date": "2023-01-01", "is_active": True
+        }
+        # The stale id index no longer points into users_list
+        self.assertFalse(self.user_manager.delete_user(1))
+        self.assertEqual(len(self.user_manager.users_list), 1)
+        
+        self.user_manager.users_list[0] = dict(
+            self.user_manager.users_list[0], id=6
+        )
+        self.user_manager.reindex()
+        self.assertEqual(self.user_manager.get_user_by_id(6)["name"], "Bob")
+        self.assertEqual(len(self.user_manager.search_users_by_name("Bob")), 1)
+        self.assertFalse(self.user_manager.add_user("B", "b@example.com", 30))
+    
+    def test_search_after_rename_and_reindex(self):
+        """Test that a name edited in place is found after reindex()."""
+        self.user_manager.add_user("John", "john@example.com", 30)
+        self.user_manager.get_user_by_id(1)["name"] = "Peter"
+        self.user_manager.reindex()
+        
+        self.assertEqual(len(self.user_manager.search_users_by_name("Peter")), 1)
+        self.assertEqual(self.user_manager.search_users_by_name("John"), [])
+    
     def test_search_users_by_name_empty_term(self):
         """Test searching with empty search term."""
         results = self.user_manager.search_users_by_name("")
@@ -262,6 +588,23 @@ class TestUserManager(unittest.TestCase):
         if os.path.exists(csv_file):
             os.unlink(csv_file)
     
+    def test_export_users_to_csv_content(self):
+        """Test that the exported CSV contains a header and every user."""
+        self.user_manager.add_user("Nguyễn Văn An", "an@example.com", 25)
+        self.user_manager.add_user("Jane Doe", "jane@example.com", 30)
+        
+        csv_file = self.temp_file_path + ".csv"
+        try:
+            self.assertTrue(self.user_manager.export_users_to_csv(csv_file))
+            with open(csv_file, newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+        finally:
+            if os.path.exists(csv_file):
+                os.unlink(csv_file)
+        
+        self.assertEqual([row["name"] for row in rows], ["Nguyễn Văn An", "Jane Doe"])
+        self.assertEqual(rows[1]["age"], "30")
+    
     def test_export_users_to_csv_empty_list(self):
         """Test exporting empty user list."""
         result = self.user_manager.export_users_to_csv("empty_export.csv")
@@ -279,6 +622,17 @@ class TestUserManager(unittest.TestCase):
         all_users.append({"test": "data"})
         self.assertEqual(len(self.user_manager.users_list), 2)
     
+    def test_iter_users(self):
+        """Test iterating over users without a copy."""
+        self.user_manager.add_user("User 1", "user1@example.com", 25)
+        self.user_manager.add_user("User 2", "user2@example.com", 30)
+        
+        users = self.user_manager.iter_users()
+        self.assertNotIsInstance(users, list)
+        users = list(users)
+        self.assertEqual([user["name"] for user in users], ["User 1", "User 2"])
+        self.assertIs(users[0], self.user_manager.users_list[0])
+    
     def test_get_user_count(self):
         """Test getting user count."""
         self.assertEqual(self.user_manager.get_user_count(), 0)
@@ -334,9 +688,10 @@ class TestUserManager(unittest.TestCase):
     
     def test_large_dataset_performance(self):
         """Test performance with larger dataset."""
-        # Add 100 users
-        for i in range(100):
-            self.user_manager.add_user(f"User {i}", f"user{i}@example.com", 20 + i)
+        # Add 100 users in a single batch
+        self.user_manager.add_users_bulk(
+            [(f"User {i}", f"user{i}@example.com", 20 + i) for i in range(100)]
+        )
         
         # Test search performance
         results = self.user_manager.search_users_by_name("User 5")
@@ -374,6 +729,34 @@ class TestUserManagerEdgeCases(unittest.TestCase):
         with self.assertRaises(IOError):
             self.user_manager.save_users()
     
+    def test_save_users_missing_directory(self):
+        """Test that a failed save raises and leaves no temp file."""
+        missing_dir = self.temp_file_path + "_missing_dir"
+        self.user_manager.data_file = os.path.join(missing_dir, "users.json")
+        self.user_manager.users_list = [{"test": "data"}]
+        
+        with self.assertRaises(IOError):
+            self.user_manager.save_users()
+        self.assertFalse(os.path.exists(missing_dir))
+    
+    def test_save_users_replaces_file(self):
+        """Test that saving replaces the data file and leaves no temp file."""
+        self.user_manager.add_user("Test User", "test@example.com", 25)
+        
+        self.assertEqual(glob.glob(self.temp_file_path + ".*.tmp"), [])
+        with open(self.temp_file_path, 'r', encoding='utf-8') as f:
+            saved_data = json.load(f)
+        self.assertEqual(saved_data[0]["email"], "test@example.com")
+    
+    @unittest.skipIf(os.name == 'nt', "POSIX permissions only")
+    def test_save_users_keeps_permissions(self):
+        """Test that saving keeps the data file's permission bits."""
+        os.chmod(self.temp_file_path, 0o600)
+        self.user_manager.add_user("Test User", "test@example.com", 25)
+        
+        mode = stat.S_IMODE(os.stat(self.temp_file_path).st_mode)
+        self.assertEqual(mode, 0o600)
+    
     def test_export_csv_io_error(self):
         """Test handling of IO errors during CSV export."""
         self.user_manager.add_user("Test User", "test@example.com", 25)
@@ -10,9 +10,65 @@ Version: 2.0.0
 """
 
 import csv
+import errno
 import json
+import mmap
+import os
+import secrets
+import stat
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import (
+    Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+)
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# Write buffer for CSV exports (1 MiB)
+_CSV_BUFFER_SIZE = 1 << 20
+
+# Data files at least this large are memory-mapped on load (1 MiB)
+_MMAP_MIN_SIZE = 1 << 20
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decode JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_json_file(file: BinaryIO) -> Any:
+    """
+    Decode an open JSON data file.
+    
+    With orjson installed, large files are memory-mapped and parsed straight
+    from the page cache instead of being copied into a bytes object first.
+    """
+    size = os.fstat(file.fileno()).st_size
+    if orjson is not None and size >= _MMAP_MIN_SIZE:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                memoryview(mapped) as view:
+            return orjson.loads(view)
+    return _json_loads(file.read())
+
+
+def _json_dumps(data: Any) -> bytes:
+    """
+    Encode data as indented UTF-8 JSON, using orjson when installed.
+    
+    The two backends agree on layout and decoded values but not on every
+    byte: orjson writes floats in its own notation (1e16 vs 1e+16) and
+    NaN/Infinity as null, while json writes NaN and Infinity, which orjson
+    cannot load back.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
 
 
 class UserManager:
@@ -22,54 +78,209 @@ class UserManager:
     This class provides methods for managing user data including adding, updating,
     deleting, and searching users. Data is persisted in JSON format.
     
+    With autosave disabled, mutations are only written by flush() (or when
+    leaving a ``with UserManager(...)`` block), so a batch of changes costs a
+    single file write.
+    
+    Users are indexed by id, email and name. Assigning a new list to
+    users_list rebuilds the indexes. Any other change made behind the
+    manager's back, whether to users_list itself (item assignment, insert,
+    pop, ...) or to the 'id', 'email' or 'name' of a stored user dict, needs
+    a call to reindex(). Only a change in the list's length is detected and
+    rebuilt automatically.
+    
     Attributes:
         data_file (str): Path to the JSON data file
         users_list (List[Dict]): List of user dictionaries
+        autosave (bool): Whether every mutation is saved immediately
+        save_every_n_mutations (Optional[int]): Flush automatically once this
+            many unsaved mutations have accumulated
     """
     
-    def __init__(self, data_file: str = "users.json") -> None:
+    def __init__(self, data_file: str = "users.json", autosave: bool = True,
+                 save_every_n_mutations: Optional[int] = None) -> None:
         """
         Initialize the UserManager.
         
         Args:
             data_file (str): Path to the JSON file for data persistence.
                            Defaults to "users.json".
+            autosave (bool): Save after every mutation. Defaults to True.
+            save_every_n_mutations (Optional[int]): When autosave is off,
+                           flush after this many mutations (each user added
+                           by add_users_bulk counts as one). Defaults to None
+                           (only flush explicitly).
         """
         self.data_file = data_file
-        self.users_list: List[Dict] = []
+        self.autosave = autosave
+        self.save_every_n_mutations = save_every_n_mutations
+        self._dirty = False
+        self._pending_mutations = 0
+        # Lookup indexes over users_list, rebuilt on load
+        self._id_index: Dict[int, Dict] = {}
+        self._email_index: Dict[str, int] = {}
+        # Case-folded names, kept parallel to users_list for search
+        self._names_lower: List[str] = []
+        self._last_id = 0
+        self._users_list: List[Dict] = []
         self.load_users()
     
+    @property
+    def users_list(self) -> List[Dict]:
+        """List of user dictionaries."""
+        return self._users_list
+    
+    @users_list.setter
+    def users_list(self, users: List[Dict]) -> None:
+        """Replace the users and rebuild the lookup indexes."""
+        self._users_list = users
+        self._rebuild_indexes()
+    
+    def __enter__(self) -> "UserManager":
+        """Return the manager for use in a ``with`` block."""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Flush pending changes when the block exits without an error."""
+        if exc_type is None:
+            self.flush()
+    
     def load_users(self) -> None:
         """
         Load users from the JSON data file.
         
-        Creates an empty list if the file doesn't exist or contains invalid JSON.
+        Creates an empty list if the file doesn't exist, contains invalid
+        JSON or does not hold a list of user records.
         """
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as file:
-                self.users_list = json.load(file)
+            with open(self.data_file, 'rb') as file:
+                users = _load_json_file(file)
         except FileNotFoundError:
-            self.users_list = []
+            users = []
         except json.JSONDecodeError:
             print("Error: Invalid JSON format in data file")
-            self.users_list = []
+            users = []
         except Exception as e:
             print(f"Error loading users: {e}")
-            self.users_list = []
+            users = []
+        
+        if not isinstance(users, list) or not all(
+            isinstance(user, dict) for user in users
+        ):
+            print("Error loading users: data file does not hold a list "
+                  "of user records")
+            users = []
+        self.users_list = users
+    
+    def reindex(self) -> None:
+        """
+        Rebuild the lookup indexes from users_list.
+        
+        Needed after changing users_list in place (other than assigning a
+        new list) or editing a user's id, email or name directly on the dict
+        instead of through the UserManager methods.
+        """
+        self._rebuild_indexes()
+    
+    def _rebuild_indexes(self) -> None:
+        """Rebuild the id, email and search indexes from users_list."""
+        self._id_index = {}
+        self._email_index = {}
+        self._names_lower = []
+        self._last_id = 0
+        for user in self.users_list:
+            self._index_user(user)
+    
+    def _sync_indexes(self) -> None:
+        """
+        Rebuild the indexes if users_list was resized behind our back.
+        
+        Only a length change is noticed; replacing items in place needs
+        reindex().
+        """
+        if len(self._names_lower) != len(self._users_list):
+            self._rebuild_indexes()
+    
+    def _index_user(self, user: Dict) -> None:
+        """
+        Add a single user (appended to users_list) to the lookup indexes.
+        
+        Records missing some fields are still kept; they are just left out of
+        the indexes that need those fields.
+        """
+        user_id = user.get('id')
+        if user_id is not None:
+            self._id_index[user_id] = user
+            if isinstance(user_id, int) and user_id > self._last_id:
+                self._last_id = user_id
+        if 'email' in user:
+            self._email_index[user['email']] = user_id
+        self._names_lower.append(str(user.get('name', '')).casefold())
     
     def save_users(self) -> None:
         """
         Save users to the JSON data file.
         
+        The data is serialized up front, written in one call to a uniquely
+        named temporary file next to the data file and then moved into place,
+        so a crash never leaves a half-written data file behind. An existing
+        data file keeps its permissions, and a read-only one is not replaced.
+        
         Raises:
             IOError: If unable to write to the file
         """
+        data = _json_dumps(self.users_list)
+        temp_path = f"{self.data_file}.{secrets.token_hex(8)}.tmp"
+        created = False
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as file:
-                json.dump(self.users_list, file, ensure_ascii=False, indent=2)
+            try:
+                mode = stat.S_IMODE(os.stat(self.data_file).st_mode)
+            except FileNotFoundError:
+                mode = None
+            if mode is not None and not os.access(self.data_file, os.W_OK):
+                raise PermissionError(
+                    errno.EACCES, os.strerror(errno.EACCES), self.data_file
+                )
+            
+            # O_EXCL never reuses another saver's file; the kernel applies
+            # the umask to the mode of a new data file
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL
+                         | getattr(os, 'O_BINARY', 0), 0o666)
+            created = True
+            with open(fd, 'wb') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            if mode is not None:
+                os.chmod(temp_path, mode)
+            os.replace(temp_path, self.data_file)
         except IOError as e:
             print(f"Error saving users: {e}")
+            if created and os.path.exists(temp_path):
+                os.unlink(temp_path)
             raise
+        self._dirty = False
+        self._pending_mutations = 0
+    
+    def flush(self) -> None:
+        """
+        Save users to the data file if there are unsaved changes.
+        
+        Raises:
+            IOError: If unable to write to the file
+        """
+        if self._dirty:
+            self.save_users()
+    
+    def _mark_dirty(self, count: int = 1) -> None:
+        """Record mutations and save them according to the autosave policy."""
+        self._dirty = True
+        self._pending_mutations += count
+        if self.autosave or (
+            self.save_every_n_mutations
+            and self._pending_mutations >= self.save_every_n_mutations
+        ):
+            self.save_users()
     
     def add_user(self, user_name: str, user_email: str, user_age: int) -> bool:
         """
@@ -93,12 +304,12 @@ class UserManager:
             return False
         
         # Check if user already exists
-        for user in self.users_list:
-            if user['email'] == user_email:
-                return False
+        self._sync_indexes()
+        if user_email in self._email_index:
+            return False
         
         new_user = {
-            'id': len(self.users_list) + 1,
+            'id': self._last_id + 1,
             'name': user_name,
             'email': user_email,
             'age': user_age,
@@ -107,9 +318,71 @@ class UserManager:
         }
         
         self.users_list.append(new_user)
-        self.save_users()
+        self._index_user(new_user)
+        self._mark_dirty()
         return True
     
+    def add_users_bulk(
+        self, users: Iterable[Union[Tuple[str, str, int], Dict]]
+    ) -> List[bool]:
+        """
+        Add many users at once, validating and saving only once.
+        
+        Each row is validated like add_user; invalid rows and rows whose email
+        already exists (in the system or earlier in the batch) are rejected.
+        All added users share one creation timestamp.
+        
+        Args:
+            users (Iterable[Union[Tuple[str, str, int], Dict]]): Rows given
+                either as (name, email, age) tuples or as dicts with 'name',
+                'email' and 'age' keys
+            
+        Returns:
+            List[bool]: One entry per row, True if that row was added
+        """
+        self._sync_indexes()
+        created_date = datetime.now().isoformat()
+        results = []
+        
+        try:
+            for row in users:
+                if isinstance(row, dict):
+                    user_name = row.get('name')
+                    user_email = row.get('email')
+                    user_age = row.get('age')
+                else:
+                    # Rows that are not (name, email, age) triples are rejected
+                    try:
+                        user_name, user_email, user_age = row
+                    except (TypeError, ValueError):
+                        results.append(False)
+                        continue
+                
+                if (not user_name or not user_email
+                        or not isinstance(user_age, int) or user_age < 0
+                        or user_email in self._email_index):
+                    results.append(False)
+                    continue
+                
+                new_user = {
+                    'id': self._last_id + 1,
+                    'name': user_name,
+                    'email': user_email,
+                    'age': user_age,
+                    'created_date': created_date,
+                    'is_active': True
+                }
+                self.users_list.append(new_user)
+                self._index_user(new_user)
+                results.append(True)
+        finally:
+            # Rows already added are recorded even if the batch is aborted;
+            # each one counts toward save_every_n_mutations
+            added = results.count(True)
+            if added:
+                self._mark_dirty(added)
+        return results
+    
     def get_user_by_id(self, user_id: int) -> Optional[Dict]:
         """
         Retrieve a user by their ID.
@@ -120,10 +393,8 @@ class UserManager:
         Returns:
             Optional[Dict]: User dictionary if found, None otherwise
         """
-        for user in self.users_list:
-            if user['id'] == user_id:
-                return user
-        return None
+        self._sync_indexes()
+        return self._id_index.get(user_id)
     
     def get_users_by_age_range(self, min_age: int, max_age: int) -> List[Dict]:
         """
@@ -139,11 +410,10 @@ class UserManager:
         if min_age > max_age:
             return []
         
-        result_list = []
-        for user in self.users_list:
-            if min_age <= user['age'] <= max_age:
-                result_list.append(user)
-        return result_list
+        return [
+            user for user in self.users_list
+            if min_age <= user['age'] <= max_age
+        ]
     
     def update_user_status(self, user_id: int, new_status: bool) -> bool:
         """
@@ -159,7 +429,7 @@ class UserManager:
         user = self.get_user_by_id(user_id)
         if user:
             user['is_active'] = new_status
-            self.save_users()
+            self._mark_dirty()
             return True
         return False
     
@@ -173,12 +443,37 @@ class UserManager:
         Returns:
             bool: True if user was deleted, False if not found
         """
-        for i, user in enumerate(self.users_list):
-            if user['id'] == user_id:
-                del self.users_list[i]
-                self.save_users()
-                return True
-        return False
+        self._sync_indexes()
+        user = self._id_index.get(user_id)
+        if user is None:
+            return False
+        
+        # Match by identity: list.index() compares with == and would
+        # remove the first equal record, not necessarily this one
+        position = next(
+            (i for i, candidate in enumerate(self.users_list)
+             if candidate is user),
+            None
+        )
+        if position is None:
+            # The indexed record was replaced in users_list without reindex()
+            self._rebuild_indexes()
+            return self.delete_user(user_id)
+        del self.users_list[position]
+        del self._names_lower[position]
+        
+        # A loaded file may hold other records with the same id or email;
+        # rebuild so that they take over the index entries
+        email = user.get('email')
+        if any(other.get('id') == user_id
+               or ('email' in user and other.get('email') == email)
+               for other in self.users_list):
+            self._rebuild_indexes()
+        else:
+            del self._id_index[user_id]
+            self._email_index.pop(email, None)
+        self._mark_dirty()
+        return True
     
     def get_active_users_count(self) -> int:
         """
@@ -193,6 +488,8 @@ class UserManager:
         """
         Search users by name (case-insensitive).
         
+        Matching uses Unicode case folding, so e.g. "STRASSE" finds "Straße".
+        
         Args:
             search_term (str): The search term
             
@@ -202,13 +499,15 @@ class UserManager:
         if not search_term:
             return []
         
-        results = []
-        search_lower = search_term.lower()
-        
-        for user in self.users_list:
-            if search_lower in user['name'].lower():
-                results.append(user)
-        return results
+        # Folded names are cached, so a search allocates no strings per user.
+        # Users changed in place (see reindex()) may be missed until then.
+        self._sync_indexes()
+        search_folded = search_term.casefold()
+        return [
+            user
+            for user, name_folded in zip(self.users_list, self._names_lower)
+            if search_folded in name_folded
+        ]
     
     def export_users_to_csv(self, output_file: str = "users_export.csv") -> bool:
         """
@@ -224,13 +523,14 @@ class UserManager:
             return False
         
         try:
-            with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+            # A large buffer turns the many small row writes into a few
+            # syscalls
+            with open(output_file, 'w', newline='', encoding='utf-8',
+                      buffering=_CSV_BUFFER_SIZE) as csvfile:
                 fieldnames = self.users_list[0].keys()
                 writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                 writer.writeheader()
-                
-                for user in self.users_list:
-                    writer.writerow(user)
+                writer.writerows(self.users_list)
             return True
         except Exception as e:
             print(f"Export error: {e}")
@@ -240,11 +540,25 @@ class UserManager:
         """
         Get all users in the system.
         
+        Returns a copy, so callers may modify the list freely. Use
+        iter_users() to just read through the users without copying.
+        
         Returns:
             List[Dict]: List of all users
         """
         return self.users_list.copy()
     
+    def iter_users(self) -> Iterator[Dict]:
+        """
+        Iterate over all users without copying the list.
+        
+        The users must not be added or deleted while iterating.
+        
+        Returns:
+            Iterator[Dict]: Iterator over all users
+        """
+        return iter(self.users_list)
+    
     def get_user_count(self) -> int:
         """
         Get the total number of users.
@@ -261,7 +575,7 @@ class UserManager:
         Warning: This action cannot be undone!
         """
         self.users_list = []
-        self.save_users()
+        self._mark_dirty()
 
 
 def main() -> None: